@@ -14,14 +14,42 @@ returns instances of the
 :mod:`StatementWrapper <pyang_builder.wrappers.StatementWrapper>` class.
 This is a design decision in order to provide a beautiful DSL-like API.
 """
-import pkg_resources
+import sys
 
 from .builder import Builder
 from .wrappers import ListWrapper, StatementWrapper
 
-try:
-    __version__ = pkg_resources.get_distribution(__name__).version
-except:  # pylint: disable=bare-except
-    __version__ = 'unknown'
-
 __all__ = ['Builder', 'ListWrapper', 'StatementWrapper']
+
+
+def _get_version():
+    """Retrieve the version of the installed distribution.
+
+    ``importlib.metadata`` is preferred, since importing ``pkg_resources``
+    scans all the installed distributions and is very slow.
+    """
+    try:
+        from importlib.metadata import version
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+
+        def version(name):  # pylint: disable=missing-docstring
+            return pkg_resources.get_distribution(name).version
+
+    try:
+        return version('pyang-builder')
+    except Exception:  # pylint: disable=broad-except
+        return 'unknown'
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Lazily resolve ``__version__`` (PEP 562)."""
+        if name == '__version__':
+            value = globals()['__version__'] = _get_version()
+            return value
+
+        raise AttributeError(
+            'module %r has no attribute %r' % (__name__, name))
+else:
+    __version__ = _get_version()
@@ -1,16 +1,43 @@
 # -*- coding: utf-8 -*-
 """Factory for programmatic generation of a YANG Abstract Syntax Tree."""
+from six.moves import intern
 
 from pyang import statements as st
 from pyang.error import Position
 from pyangext.definitions import PREFIX_SEPARATOR
 
-from .wrappers import StatementWrapper, is_statement, is_wrapper
+from .wrappers import (
+    _STATEMENT_CLASSES,
+    _TOP_LEVEL,
+    StatementWrapper,
+    _new_statement
+)
 
 __author__ = "Anderson Bravalheri"
 __copyright__ = "Copyright (C) 2016 Anderson Bravalheri"
 __license__ = "mozilla"
 
+# Translation of python attribute names into YANG keywords.
+# The conversion is pure, so it can be shared among builders.
+_KEYWORD_CACHE = {}
+# Maximum number of translations memoized. Any attribute name ends up
+# here (including typos), so the caches should not grow indefinitely.
+_KEYWORD_CACHE_SIZE = 1024
+# Maximum number of factories memoized by each builder
+_FACTORY_CACHE_SIZE = 256
+
+# Types of ``arg`` that actually denote children (``arg`` omitted).
+# Exact type matches are resolved by hashing, ``isinstance`` is just
+# used as fallback (subclasses) for types that are not common scalars.
+_CHILD_CLASSES = (list, tuple, st.Statement, StatementWrapper)
+_CHILD_TYPES = frozenset(_CHILD_CLASSES)
+_SCALAR_TYPES = frozenset((type(None), str, type(u''), bool, int, float))
+# Types accepted as already built nodes
+_NODE_CLASSES = (st.Statement, StatementWrapper)
+
+# Maximum number of tuple-expressions memoized by each builder
+_TUPLE_CACHE_SIZE = 256
+
 
 class Builder(object):
     """Statement generator factory for YANG modeling language.
@@ -55,7 +82,9 @@ class Builder(object):
 
     When the builder itself is called, the first argument is used as
     keyword for the statement and the second is used as its argument.
-    Optional child (or a children list) and parent nodes can be passed::
+    Optional child (or a children list) and parent nodes can be passed.
+    When a parent is given, the statement is appended to its sub-statements
+    (there is no need to ``append`` it afterwards)::
 
         >>> Y('ext:c-define', 'INTERFACES',
                      Y.if_feature('local-storage'), parent=module).dump()
@@ -100,6 +129,9 @@ class Builder(object):
         threads or even used to build multiple trees simultaneously.
 
     """
+
+    __slots__ = ('_pos', '_top', '_factory_cache', '_tuple_cache')
+
     def __init__(self, name='builder-generated', top=None, keyword='module'):
         """Initialize builder.
 
@@ -119,12 +151,19 @@ class Builder(object):
 
         # Creates a dummy outermost module statement to simplify
         # traversing tree logic
-        self._top = top or st.Statement(None, None, self._pos, keyword, name)
+        self._top = top or _STATEMENT_CLASSES.get(keyword, st.Statement)(
+            None, None, self._pos, keyword, name)
 
         if not self._pos.top:
             self._pos.top = self._top
 
-    def __call__(self, keyword, arg=None, children=None, parent=None):
+        # factories generated by ``__getattr__``, indexed by attribute name
+        self._factory_cache = {}
+        # template statements, indexed by (type-tagged) leaf expression
+        self._tuple_cache = {}
+
+    def __call__(self, keyword, arg=None, children=None, parent=None,
+                 prefix=None):
         """Magic method to generate YANG statements.
 
         Arguments:
@@ -134,78 +173,184 @@ class Builder(object):
         Keyword Arguments:
             children: optional statement or list to be inserted
                 as sub-statement
-            parent (pyang.statements.Statement): optional parent statement
+            parent (pyang.statements.Statement): optional parent statement,
+                the generated statement is appended to its sub-statements
+                (``parent.append`` ignores statements already appended)
+            prefix (str): optional prefix to be prepended to the keyword
 
         Returns:
             StatementWrapper: wrapper around ``pyang.statements.Statement``.
                 call ``unwrap`` if direct access is necessary.
         """
-        children = children or []
-
-        if is_statement(keyword):
-            return StatementWrapper(keyword, self)
+        node = self._build(keyword, arg, children, parent, prefix)
 
-        if is_wrapper(keyword):
+        # wrappers are returned as they are, preserving identity
+        if isinstance(keyword, StatementWrapper):
             return keyword
 
-        if isinstance(arg, (list, tuple, st.Statement, StatementWrapper)):
-            children = arg
-            arg = None
+        return StatementWrapper(node, self)
 
-        if not isinstance(children, list):
-            children = [children]
+    def _build(self, keyword, arg=None, children=None, parent=None,
+               prefix=None):
+        """Generates a bare ``pyang.statements.Statement``.
 
-        if isinstance(arg, bool):
-            arg = str(arg).lower()
+        Internal counterpart of :meth:`__call__`, that does not allocate
+        wrappers for the generated nodes.
+        """
+        children = children or []
+        parent_node = (
+            parent.unwrap() if isinstance(parent, StatementWrapper)
+            else parent)
+
+        if isinstance(keyword, _NODE_CLASSES):
+            node = (
+                keyword.unwrap() if isinstance(keyword, StatementWrapper)
+                else keyword)
+            if parent_node is not None:
+                node.parent = parent_node
+                parent_node.substmts.append(node)
+
+            return node
 
-        # ensure arg will be string
-        if arg is not None:
-            arg = str(arg)
+        if prefix is not None:
+            keyword = PREFIX_SEPARATOR.join([prefix, keyword])
+
+        # keywords form a small vocabulary, interning them allows
+        # comparisons (and dict lookups) to be resolved by identity
+        if type(keyword) is str:  # pylint: disable=unidiomatic-typecheck
+            keyword = intern(keyword)
+
+        # normalize arg in a single type dispatch,
+        # strings (the most common case) need no treatment at all
+        arg_type = type(arg)
+        if arg_type is not str and arg is not None:
+            if arg_type in _CHILD_TYPES or (
+                    arg_type not in _SCALAR_TYPES and
+                    isinstance(arg, _CHILD_CLASSES)):
+                children = arg
+                arg = None
+            elif arg_type is bool:
+                arg = 'true' if arg else 'false'
+            else:
+                # ensure arg will be string
+                arg = str(arg)
 
-        if keyword in ('module', 'submodule'):
+        if not isinstance(children, list):
+            children = [children]
+
+        if keyword in _TOP_LEVEL:
+            # the top statement is shared, so it is modified in place
             node = self._top
             node.keyword = keyword
             node.arg = arg
             node.i_module = node
         else:
-            parent_node = parent.unwrap() if is_wrapper(parent) else parent
-
-            node = st.Statement(
-                self._top, parent_node, self._top.pos, keyword, arg)
-            node.i_module = self._top
-
-        unwraped_children = []
-        for child in children:
-            if is_wrapper(child):
-                unwraped = child.unwrap()
-            elif isinstance(child, tuple):
-                unwraped = self.from_tuple(child).unwrap()
-            else:
-                unwraped = child
+            node = _new_statement(
+                self._top, parent_node, self._pos, keyword, arg)
+
+        if parent_node is not None:
+            parent_node.substmts.append(node)
+
+        if not children:
+            node.substmts = []
+            return node
+
+        # pylint: disable=protected-access,unidiomatic-typecheck
+        if all(type(child) is StatementWrapper for child in children):
+            # fast path: children built with the DSL are already wrapped
+            unwraped_children = [child._statement for child in children]
+        else:
+            unwrap = self._unwrap
+            unwraped_children = [unwrap(child) for child in children]
+
+        for unwraped in unwraped_children:
             unwraped.parent = node
-            unwraped_children.append(unwraped)
 
         node.substmts = unwraped_children
 
-        return StatementWrapper(node, self)
+        return node
+
+    def _from_leaf_tuple(self, tuple_expression, parent=None):
+        """Generates a bare statement without children from a tuple-expression
+
+        Expressions formed just by scalars (e.g. ``('type', 'string')``)
+        are very repetitive, so they are memoized: the cached statement is
+        used as a template and a fresh copy is returned for each call.
+        """
+        build = self._build
+        if (tuple_expression[0] in _TOP_LEVEL or not all(
+                type(item) in _SCALAR_TYPES for item in tuple_expression)):
+            # top-level statements are shared, not copied
+            return build(*tuple_expression, parent=parent)
+
+        # scalars other than strings are tagged with their types, since
+        # e.g. ``1``, ``1.0`` and ``True`` are equal but rendered differently
+        # pylint: disable=unidiomatic-typecheck
+        key = tuple(
+            item if type(item) is str else (type(item), item)
+            for item in tuple_expression)
+
+        cache = self._tuple_cache
+        template = cache.get(key)
+        if template is None:
+            if len(cache) >= _TUPLE_CACHE_SIZE:
+                return build(*tuple_expression, parent=parent)
+
+            template = cache[key] = build(*tuple_expression)
+
+        node = _new_statement(
+            self._top, None, self._pos, template.keyword, template.arg)
+
+        return build(node, parent=parent)
+
+    def _unwrap(self, child):
+        """Retrieve the statement corresponding to a child specification"""
+        if isinstance(child, StatementWrapper):
+            return child.unwrap()
+
+        if isinstance(child, tuple):
+            return self._from_tuple_raw(child)
+
+        return child
 
     def __getattr__(self, keyword):
-        """Magic method to generate YANG statements."""
-        keyword = keyword.replace('__', ':').replace('_', '-')
+        """Magic method to generate YANG statements.
+
+        The generated factories accept ``arg``, ``children`` and ``prefix``
+        (also positionally, in this order). Other arguments of
+        :meth:`__call__` should be given by keyword, e.g. if ``parent`` is
+        given, the statement is appended to its sub-statements.
+        """
+        if keyword.startswith('_'):
+            # private/special names are never keywords, and the internal
+            # caches may not exist (e.g. ``__init__`` was not called)
+            raise AttributeError(keyword)
+
+        cache = self._factory_cache
+        factory = cache.get(keyword)
+        if factory is not None:
+            return factory
+
+        name = keyword
+        keyword = _KEYWORD_CACHE.get(name)
+        if keyword is None:
+            keyword = intern(name.replace('__', ':').replace('_', '-'))
+            if len(_KEYWORD_CACHE) < _KEYWORD_CACHE_SIZE:
+                _KEYWORD_CACHE[name] = keyword
+
         build = self.__call__
 
         def _factory(arg=None, children=None, prefix=None, **kwargs):
-            node_type = keyword
-            if prefix is not None:
-                node_type = PREFIX_SEPARATOR.join([prefix, keyword])
+            return build(keyword, arg, children, prefix=prefix, **kwargs)
 
-            return build(node_type, arg, children, **kwargs)
+        if len(cache) < _FACTORY_CACHE_SIZE:
+            cache[name] = _factory
 
         return _factory
 
-    def blankline(self):
+    def blankline(self, parent=None):
         """Insert a empty line."""
-        return self.__call__('_comment', ' ')
+        return self.__call__('_comment', ' ', parent=parent)
 
     def comment(self, text, parent=None):
         """Generate a comment node.
@@ -217,11 +362,11 @@ class Builder(object):
         if len(lines) == 1:
             text = '// ' + lines[0]
         else:
-            text = (
-                '/*\n' +
-                '\n'.join(['* ' + line for line in lines]) +
-                '\n*/'
-            )
+            text = ''.join((
+                '/*\n',
+                '\n'.join('* ' + line for line in lines),
+                '\n*/',
+            ))
 
         return self.__call__('_comment', text, parent=parent)
 
@@ -253,7 +398,8 @@ class Builder(object):
         Arguments:
             tuple_expression (tuple): tuple-expression representation
                 of a statement
-            parent (pyang.statements.Statement): optional parent statement
+            parent (pyang.statements.Statement): optional parent statement,
+                the generated statement is appended to its sub-statements
 
         Example:
             The statement `leaf counter { type int32; }` can be generated by::
@@ -262,22 +408,42 @@ class Builder(object):
 
         See :meth:`Builder.__call__`.
         """
-        if is_statement(tuple_expression):
-            return StatementWrapper(tuple_expression, self)
+        if isinstance(tuple_expression, StatementWrapper):
+            return self(tuple_expression, parent=parent)
 
-        if is_wrapper(tuple_expression):
-            return tuple_expression
+        return StatementWrapper(
+            self._from_tuple_raw(tuple_expression, parent), self)
 
-        if not isinstance(tuple_expression, tuple):
-            raise TypeError(
-                'argument should be tuple, %s given', type(tuple_expression))
+    def _from_tuple_raw(self, tuple_expression, parent=None):
+        """Generates a bare statement from a tuple-expression.
 
-        last = tuple_expression[-1]
-        if isinstance(last, list):
-            node = self(*tuple_expression[:-1], parent=parent)
-            for child in last:
-                node.append(self.from_tuple(child, parent=node))
+        Internal counterpart of :meth:`from_tuple`, that does not allocate
+        wrappers for the generated nodes.
+        """
+        build = self._build
+        root = None
+
+        # Nested expressions are processed using an explicit stack,
+        # avoiding one python frame per node in deep trees.
+        # Nodes are attached to their parents by ``_build``.
+        stack = [(tuple_expression, parent)]
+        while stack:
+            expression, node_parent = stack.pop()
+
+            if isinstance(expression, _NODE_CLASSES):
+                node = build(expression, parent=node_parent)
+            elif not isinstance(expression, tuple):
+                raise TypeError(
+                    'argument should be tuple, %s given', type(expression))
+            elif isinstance(expression[-1], list):
+                node = build(*expression[:-1], parent=node_parent)
+                # reversed, so children are popped in the original order
+                stack.extend(
+                    (child, node) for child in reversed(expression[-1]))
+            else:
+                node = self._from_leaf_tuple(expression, node_parent)
 
-            return node
+            if root is None:
+                root = node
 
-        return self(*tuple_expression, parent=parent)
+        return root
@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 """Components responsible for providing a ``FlentInterface``-like DSL."""
+from copy import copy as shallow_copy
+from operator import attrgetter, methodcaller
 
+from six import string_types
+
+from pyang import grammar
 from pyang import statements as st
-from pyangext.utils import check, create_context, dump, select, walk
+from pyang.error import Position
+from pyangext.definitions import PREFIX_SEPARATOR
+from pyangext.utils import check, create_context, dump, select
 
 __author__ = "Anderson Bravalheri"
 __copyright__ = "Copyright (C) 2016 Anderson Bravalheri"
@@ -19,6 +26,168 @@ def is_wrapper(node):
     return isinstance(node, StatementWrapper)
 
 
+# Maximum number of callables memoized by each wrapper
+_ATTR_CACHE_SIZE = 64
+
+# Specialized statement classes, indexed by keyword (recent pyang versions)
+_STATEMENT_CLASSES = getattr(st, 'STMT_CLASS_FOR_KEYWD', {})
+
+# Keywords of the statements that can be validated (and that are shared
+# by all the nodes generated by a builder)
+_TOP_LEVEL = frozenset(('module', 'submodule'))
+
+
+def _copy_position(pos):
+    """Cheaper equivalent of ``copy.copy`` for ``pyang.error.Position``"""
+    if pos is None:
+        return None
+
+    copy = Position(pos.ref)
+    copy.line = pos.line
+    copy.top = pos.top
+    copy.uses_pos = getattr(pos, 'uses_pos', None)
+
+    return copy
+
+
+def _new_statement(top, parent, pos, keyword, arg):
+    """Create a ``pyang.statements.Statement`` skipping its constructor.
+
+    The attributes set by ``Statement.__init__`` are assigned directly,
+    which is considerably cheaper for bulk generation. As done by
+    ``pyang.statements.new_statement``, the class of the node depends on
+    the keyword and ``pos`` is copied (so errors reported against one
+    node do not affect others).
+    """
+    factory = _STATEMENT_CLASSES.get(keyword, st.Statement)
+    node = factory.__new__(factory)
+    node.top = top
+    node.parent = node.stmt_parent = parent
+    node.pos = _copy_position(pos)
+    node.raw_keyword = node.keyword = keyword
+    node.ext_mod = None
+    node.arg = arg
+    node.substmts = []
+    node.i_module = top
+    if keyword in _TOP_LEVEL and hasattr(node, '_init_i_attrs'):
+        # pylint: disable=protected-access
+        node._init_i_attrs()
+
+    return node
+
+
+def clone_statement(statement, parent=None):
+    """Copy a statement and all its descendants.
+
+    Equivalent to ``Statement.copy`` (without the ``uses`` related
+    arguments): each node is shallow copied, so its class, ``ext_mod``,
+    ``i_module`` and the other attributes are preserved, and gets its own
+    copy of ``pos``. Differently from ``Statement.copy``, descendants are
+    copied using an explicit stack (instead of recursion).
+
+    Arguments:
+        statement (pyang.statements.Statement): root of the tree to be copied
+        parent (pyang.statements.Statement): parent of the copy
+            (it is not modified). When omitted, the copy keeps the parent
+            of the original statement.
+    """
+    if parent is None:
+        parent = statement.parent
+    root = _copy_node(statement, parent)
+
+    stack = [(statement, root)]
+    while stack:
+        original, node = stack.pop()
+        add = node.substmts.append
+        for child in original.substmts:
+            clone = _copy_node(child, node)
+            add(clone)
+            if child.substmts:
+                stack.append((child, clone))
+
+    return root
+
+
+def _copy_node(node, parent):
+    """Copy a single statement, without its descendants"""
+    clone = shallow_copy(node)
+    clone.pos = _copy_position(node.pos)
+    clone.parent = parent
+    clone.substmts = []
+
+    return clone
+
+
+def _check_grammar(ctx, module):
+    """Run ``pyang.grammar.chk_module_statements`` for a generated tree.
+
+    The attributes the grammar check expects from the parser are filled in
+    first: ``i_version`` of the module (from ``yang-version``) and
+    ``i_module`` of the nodes. Keywords like ``prefix:name`` are exchanged
+    by ``(prefix, name)`` tuples during the check, so they are treated as
+    extensions (as pyang does).
+    """
+    version = module.search_one('yang-version')
+    module.i_version = version.arg if version is not None else '1'
+
+    prefixed = []
+    stack = [module]
+    while stack:
+        node = stack.pop()
+        if getattr(node, 'i_module', None) is None:
+            node.i_module = module
+        keyword = node.keyword
+        if isinstance(keyword, string_types) and PREFIX_SEPARATOR in keyword:
+            prefixed.append((node, keyword, node.raw_keyword))
+            node.keyword = node.raw_keyword = tuple(
+                keyword.split(PREFIX_SEPARATOR, 1))
+        stack.extend(node.substmts)
+
+    try:
+        grammar.chk_module_statements(ctx, module)
+    finally:
+        for node, keyword, raw_keyword in prefixed:
+            node.keyword = keyword
+            node.raw_keyword = raw_keyword
+
+
+def walk(node, select=None, apply=None, key='substmts'):
+    # pylint: disable=redefined-outer-name
+    """Recursivelly find nodes and/or apply a function to them.
+
+    Iterative (pre-order) implementation of :func:`pyangext.utils.walk`,
+    using an explicit stack instead of one python frame per node.
+
+    See :meth:`StatementWrapper.walk`.
+    """
+    results = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if select is None or select(current):
+            results.append(current if apply is None else apply(current))
+        # reversed, so children are popped in the original order
+        stack.extend(reversed(getattr(current, key, None) or ()))
+
+    return results
+
+
+def _check_module(ctx, module, rescue=False, syntax_only=False):
+    """Run the pyang validation and collect the errors.
+
+    See :meth:`StatementWrapper.validate`.
+    """
+    if syntax_only:
+        _check_grammar(ctx, module)
+    else:
+        st.validate_module(ctx, module)
+
+    # look for errors and warnings
+    errors, _ = check(ctx, rescue)
+
+    return errors
+
+
 class StatementWrapper(object):
     """Provides a elegant way of constructing YANG models.
 
@@ -27,6 +196,9 @@ class StatementWrapper(object):
     in an object oriented chainable way.
     """
 
+    __slots__ = (
+        '_statement', '_builder', '_attr_cache', '_i_index')
+
     def __init__(self, statement, builder):
         """Create a builder wrapper around ``pyang.statements.Statement``.
 
@@ -46,32 +218,50 @@ class StatementWrapper(object):
         """
         self._statement = statement
         self._builder = builder
+        # callables generated by ``__getattr__`` (lazily created)
+        self._attr_cache = None
+        # (i_children, length, i_children by (keyword, arg))
+        self._i_index = None
 
     def __call__(self, *args, **kwargs):
         """Call ``__call__`` from builder, adding result as sub-statement.
 
         See :class:`Builder <..builder.Builder>`.
         """
-        kwargs.setdefault('parent', self._statement)
-        other_wrapper = self._builder.__call__(*args, **kwargs)
-        self._statement.substmts.append(other_wrapper.unwrap())
+        if 'parent' in kwargs:
+            return self._builder.__call__(*args, **kwargs)
 
-        return other_wrapper
+        return self._builder.__call__(
+            *args, parent=self._statement, **kwargs)
 
     def __getattr__(self, name):
         """Call ``__getattr__`` from builder, adding result as sub-statement.
 
         See :class:`Builder <..builder.Builder>`.
         """
+        if name.startswith('_'):
+            # see ``Builder.__getattr__``
+            raise AttributeError(name)
+
+        cache = self._attr_cache
+        if cache is None:
+            cache = self._attr_cache = {}
+        else:
+            call = cache.get(name)
+            if call is not None:
+                return call
+
         method = getattr(self._builder, name)
         parent = self._statement
 
         def _call(*args, **kwargs):
-            kwargs.setdefault('parent', self._statement)
-            other_wrapper = method(*args, **kwargs)
-            parent.substmts.append(other_wrapper.unwrap())
+            if 'parent' in kwargs:
+                return method(*args, **kwargs)
+
+            return method(*args, parent=parent, **kwargs)
 
-            return other_wrapper
+        if len(cache) < _ATTR_CACHE_SIZE:
+            cache[name] = _call
 
         return _call
 
@@ -88,10 +278,10 @@ class StatementWrapper(object):
     @property
     def children(self):
         """List of children nodes"""
-        return ListWrapper([
-            self.__class__(child, self._builder)
-            for child in self._statement.substmts
-        ])
+        factory = self.__class__
+        builder = self._builder
+        return ListWrapper(
+            factory(child, builder) for child in self._statement.substmts)
 
     def dump(self, *args, **kwargs):
         """Returns the string representation of the YANG module.
@@ -100,14 +290,28 @@ class StatementWrapper(object):
         """
         return dump(self._statement, *args, **kwargs)
 
-    def copy(self, *args, **kwargs):
-        """Copy the node.
+    def copy(self, parent=None, *args, **kwargs):
+        """Copy the node (and its descendants).
+
+        Accepts the same arguments as ``pyang.statements.Statement.copy``.
+        When just ``parent`` is given, :func:`clone_statement` is used
+        instead, so deep trees are copied without recursion.
 
         Arguments:
-            parent: new parent node
+            parent: new parent node (by default, the copy keeps the parent
+                of the original node)
         """
-        return self.__class__(
-            self._statement.copy(*args, **kwargs), self.builder)
+        # pylint: disable=keyword-arg-before-vararg
+        if isinstance(parent, StatementWrapper):
+            parent = parent.unwrap()
+
+        node = self._statement
+        if args or kwargs:
+            clone = node.copy(parent, *args, **kwargs)
+        else:
+            clone = clone_statement(node, parent)
+
+        return self.__class__(clone, self._builder)
 
     def find(self, *args, **kwargs):
         """find all children of the current node who match certain criteria.
@@ -121,11 +325,43 @@ class StatementWrapper(object):
         Returns:
             list: nodes that matches the conditions
         """
-        children = select(self._statement.substmts, *args, **kwargs)
-        return ListWrapper(
-            self.__class__(child, self._builder)
-            for child in children
-        )
+        substmts = self._statement.substmts
+        if not substmts:
+            return ListWrapper()
+
+        children = select(substmts, *args, **kwargs)
+        factory = self.__class__
+        builder = self._builder
+        return ListWrapper(factory(child, builder) for child in children)
+
+    def find_child(self, keyword, arg):
+        """Retrieve a schema node from ``i_children`` by keyword and arg.
+
+        ``i_children`` is populated by :meth:`validate` (all ``uses``
+        expanded). The nodes are indexed in the first call, so subsequent
+        calls do not depend on the number of children.
+
+        Returns:
+            StatementWrapper: first node that matches the conditions,
+                or ``None``
+        """
+        children = getattr(self._statement, 'i_children', None)
+        if not children:
+            return None
+
+        cache = self._i_index
+        if (cache is None or cache[0] is not children or
+                cache[1] != len(children)):
+            index = {}
+            for child in children:
+                index.setdefault((child.keyword, child.arg), child)
+            cache = self._i_index = (children, len(children), index)
+
+        child = cache[2].get((keyword, arg))
+        if child is None:
+            return None
+
+        return self.__class__(child, self._builder)
 
     def walk(self, *args, **kwargs):
         """Recursivelly find nodes and/or apply a function to them.
@@ -144,8 +380,10 @@ class StatementWrapper(object):
         children = walk(self._statement, *args, **kwargs)
         builder = self._builder
         factory = self.__class__
+        statement_class = st.Statement
         return ListWrapper(
-            is_statement(child) and factory(child, builder) or child
+            factory(child, builder)
+            if isinstance(child, statement_class) else child
             for child in children
         )
 
@@ -164,24 +402,41 @@ class StatementWrapper(object):
             copy (bool): If true, the node will be copied and not modified
                 in place
 
+        Children built with ``parent=`` pointing to this node are already
+        sub-statements, so they are not appended again (without copy).
+
         Returns:
             StatementWrapper: wrapper itself
         """
         statement = self._statement
-        sub_statements = statement.substmts
-        copy = kwargs.get('copy')
+        substmts = statement.substmts
+        wrapper_class = StatementWrapper
 
-        for child in children:
-            sub = child.unwrap() if is_wrapper(child) else child
-            if copy:
-                sub = sub.copy(statement)
-            else:
-                sub.parent = statement
-            sub_statements.append(sub)
+        # pylint: disable=protected-access
+        nodes = [
+            child._statement if isinstance(child, wrapper_class) else child
+            for child in children
+        ]
+
+        if kwargs.get('copy'):
+            nodes = [clone_statement(node, statement) for node in nodes]
+        else:
+            # just nodes whose parent is already this statement can be
+            # duplicated, so the (linear) search is restricted to them
+            nodes = [
+                node for node in nodes
+                if node.parent is not statement or
+                not any(sub is node for sub in substmts)
+            ]
+            for node in nodes:
+                node.parent = statement
+
+        # all the children are added at once
+        substmts.extend(nodes)
 
         return self
 
-    def validate(self, ctx=None, rescue=False):
+    def validate(self, ctx=None, rescue=False, syntax_only=False):
         """Validates the syntax tree.
 
         Should be called just from ``module``, ``submodule`` statements.
@@ -192,85 +447,96 @@ class StatementWrapper(object):
         Keyword Arguments:
             rescue (bool): do not raise Exception
                 if validation finishes with errors
+            syntax_only (bool): just check the statements against the YANG
+                grammar (cardinality and arguments), as pyang does when
+                parsing. The expensive semantic phases (imports, types,
+                ``uses`` expansion...) are skipped, so ``i_children`` is
+                not populated. Keywords like ``prefix:name`` are treated
+                as extensions.
         """
         node = self._statement
-        if node.keyword not in ('module', 'submodule'):
+        # fail fast, before any context is created
+        if node.keyword not in _TOP_LEVEL:
             raise ValueError(
                 'Cannot validate `%s`, only top-level statements '
-                '(module, submodule)', node.keyword)
-
-        ctx_ = ctx or create_context()
-
-        # do not mix validation errors with other errors
-        old_errors = ctx_.errors
-        ctx_.errors = []
-
-        st.validate_module(ctx_, node)
-
-        # look for errors and warnings
-        errors, _ = check(ctx_, rescue)
+                '(module, submodule)' % (node.keyword,))
 
-        # restore old errors
-        ctx_.errors = old_errors
+        if ctx is None:
+            # fresh context, there are no other errors to preserve
+            ctx = create_context()
+            ctx.errors = []
+            errors = _check_module(ctx, node, rescue, syntax_only)
+        else:
+            # do not mix validation errors with other errors
+            old_errors = ctx.errors
+            ctx.errors = []
+            try:
+                errors = _check_module(ctx, node, rescue, syntax_only)
+            finally:
+                # restore old errors
+                ctx.errors = old_errors
+
+        if syntax_only:
+            return not errors
 
         return node.i_is_validated and not errors
 
     def __repr__(self):
         """Unique representation for debugging purposes."""
         node = self._statement
-        return '<{}.{}({} "{}") at {}>'.format(
+        return '<%s.%s(%s "%s") at %#x>' % (
             self.__module__, self.__class__.__name__,
-            node.keyword, node.arg, hex(id(self)))
+            node.keyword, node.arg, id(self))
 
 
-# --- Meta-Programing ---
-#
-# generates a parent class that wraps all the list methods that returns
-# lists.
-_LIST_METHODS = [
-    '__add__', '__iadd__', '__reversed__',
-    '__mul__', '__imul__', '__rmul__',
-]
+class ListWrapper(list):
+    """Provides a elegant way of searching YANG models.
 
-if hasattr(list, '__getslice__'):
-    _LIST_METHODS.append('__getslice__')
+    This class provides the same functionality of
+    :method:`find() <pyang_builder.wrappers.StatementWrapper.find>`,
+    but search for children of more than one node.
+    """
 
+    __slots__ = ()
 
-# This new methods should return custom lists
-def _wraper(method):
-    """Wraps a list method to make it return a custom list"""
+    # list methods that return lists should return wrapped lists
+    def __add__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
 
-    def _wrapped(self, *args, **kwargs):
-        result = method(self, *args, **kwargs)
-        return self.__class__(result)
+        result = self.__class__(self)
+        result.extend(other)
+        return result
 
-    _wrapped.__doc__ = method.__doc__
-    _wrapped.__name__ = method.__name__
+    def __iadd__(self, other):
+        list.__iadd__(self, other)
+        return self
 
-    return _wrapped
+    def __mul__(self, other):
+        result = self.__class__(self)
+        list.__imul__(result, other)
+        return result
 
-_CustomList = type('_CustomList', (list,), {
-    method: _wraper(getattr(list, method))
-    for method in _LIST_METHODS
-})
-# ---
+    __rmul__ = __mul__
 
+    def __imul__(self, other):
+        list.__imul__(self, other)
+        return self
 
-class ListWrapper(_CustomList):
-    """Provides a elegant way of searching YANG models.
+    def __reversed__(self):
+        return self.__class__(list.__reversed__(self))
 
-    This class provides the same functionality of
-    :method:`find() <pyang_builder.wrappers.StatementWrapper.find>`,
-    but search for children of more than one node.
-    """
+    if hasattr(list, '__getslice__'):
+        def __getslice__(self, i, j):
+            return self.__class__(
+                list.__getslice__(self, i, j))  # pylint: disable=no-member
 
     def __getitem__(self, index):
         """Wrap list.__getitem__ ensuring slices are wrapped objects"""
-        result = super(ListWrapper, self).__getitem__(index)
-        if isinstance(index, slice):
-            return self.__class__(result)
+        if index.__class__ is slice:
+            return self.__class__(list.__getitem__(self, index))
 
-        return result
+        return list.__getitem__(self, index)
 
     def invoke(self, method, *args, **kwargs):
         """Iter over the items invoking a method and collecting the results.
@@ -289,16 +555,13 @@ class ListWrapper(_CustomList):
                 will be assumed lists, and will be merged in the output list
                 using the ``extend`` method.
         """
+        extend = kwargs.pop('extend', False)
         results = self.__class__()
-        if kwargs.get('extend'):
-            accumulte = results.extend
-            del kwargs['extend']
-        else:
-            accumulte = results.append
+        accumulate = results.extend if extend else results.append
 
+        call = methodcaller(method, *args, **kwargs)
         for node in self:
-            attr = getattr(node, method)
-            accumulte(attr(*args, **kwargs))
+            accumulate(call(node))
 
         return results
 
@@ -308,7 +571,8 @@ class ListWrapper(_CustomList):
         Arguments:
             attr (str): name of the attribute to be collected.
         """
-        return self.__class__(getattr(item, attr) for item in self)
+        getter = attrgetter(attr)
+        return self.__class__(getter(item) for item in self)
 
     def find(self, *args, **kwargs):
         """Find all children of node in the list who match certain criteria.
@@ -327,11 +591,77 @@ class ListWrapper(_CustomList):
             node.find('leaf').find('type')
             # => [<Statement (type string)>, <Statement (type int)>]
 
+        Items that are not wrappers (e.g. plain ``pyang`` statements) are
+        also supported, but their results are not wrapped.
 
         See :meth:`StatementWrapper.find`.
         """
-        kwargs['extend'] = True
-        return self.invoke('find', *args, **kwargs)
+        # pylint: disable=protected-access
+        # bind globals used inside the loop as locals
+        select_children = select
+        wrapper_class = StatementWrapper
+
+        results = self.__class__()
+        accumulate = results.extend
+        for node in self:
+            if not isinstance(node, wrapper_class):
+                accumulate(
+                    node.find(*args, **kwargs) if hasattr(node, 'find')
+                    else select_children(node.substmts, *args, **kwargs))
+                continue
+
+            substmts = node._statement.substmts
+            if not substmts:
+                continue
+
+            factory = node.__class__
+            builder = node._builder
+            accumulate(
+                factory(child, builder)
+                for child in select_children(substmts, *args, **kwargs)
+            )
+
+        return results
+
+    def find_path(self, *keywords):
+        """Find descendants of the nodes in the list following keywords.
+
+        This method is equivalent to chaining ``find`` calls, e.g.::
+
+            nodes.find_path('leaf', 'type')
+            # same as: nodes.find('leaf').find('type')
+
+        but intermediate levels are collected in a single pass, without
+        being wrapped. Prefer it for searches deeper than one level.
+
+        Arguments:
+            *keywords (str): keyword expected in each level of the path
+        """
+        # pylint: disable=protected-access
+        select_children = select
+        wrapper_class = StatementWrapper
+
+        results = self.__class__()
+        accumulate = results.extend
+        for node in self:
+            is_wrapper_node = isinstance(node, wrapper_class)
+            current = [node._statement if is_wrapper_node else node]
+            for keyword in keywords:
+                current = [
+                    child
+                    for parent in current
+                    for child in select_children(parent.substmts, keyword)
+                ]
+
+            if not is_wrapper_node:
+                accumulate(current)
+                continue
+
+            factory = node.__class__
+            builder = node._builder
+            accumulate(factory(child, builder) for child in current)
+
+        return results
 
     def walk(self, *args, **kwargs):
         """Recursivelly find nodes and/or apply a function to them.
@@ -342,10 +672,29 @@ class ListWrapper(_CustomList):
 
         See :meth:`StatementWrapper.walk`.
         """
-        kwargs['extend'] = True
-        return self.invoke('walk', *args, **kwargs)
+        # pylint: disable=protected-access
+        # bind globals used inside the loop as locals
+        walk_tree = walk
+        statement_class = st.Statement
+
+        results = self.__class__()
+        accumulate = results.extend
+        for node in self:
+            if not isinstance(node, StatementWrapper):
+                accumulate(walk_tree(node, *args, **kwargs))
+                continue
+
+            factory = node.__class__
+            builder = node._builder
+            accumulate(
+                factory(child, builder)
+                if isinstance(child, statement_class) else child
+                for child in walk_tree(node._statement, *args, **kwargs)
+            )
+
+        return results
 
     def __repr__(self):
-        return '<{}.{} at {}: {}>'.format(
+        return '<%s.%s at %#x: %s>' % (
             self.__module__, self.__class__.__name__,
-            hex(id(self)), super(ListWrapper, self).__repr__())
+            id(self), list.__repr__(self))
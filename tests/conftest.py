@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
 """
     Dummy conftest.py for pyang-builder.
 
@@ -11,6 +12,8 @@ from __future__ import absolute_import, division, print_function
 
 import pytest
 
+from pyangext.utils import create_context
+
 from pyang_builder import Builder
 
 
@@ -18,3 +21,40 @@ from pyang_builder import Builder
 def Y():
     """YANG Builder"""
     return Builder()
+
+
+@pytest.fixture(scope='module')
+def container_template():
+    """Sample container, built just once per test module"""
+    return Builder('container-template').container('outer', [
+        ('leaf', 'id', [('type', 'int32')]),
+        ('leaf', 'name', [('type', 'string')]),
+    ])
+
+
+@pytest.fixture
+def container(container_template):
+    """Sample container (a fresh copy of the template for each test)
+
+    The copy keeps the builder of the template, so nodes generated from it
+    (e.g. ``container.leaf(...)``) belong to the same tree.
+    """
+    return container_template.copy()
+
+
+@pytest.fixture(scope='session')
+def base_ctx():
+    """pyang context shared by the whole session.
+
+    Creating a context involves loading plugins and scanning the search
+    path for modules, so it is done just once.
+    """
+    return create_context()
+
+
+@pytest.fixture
+def ctx(base_ctx):
+    """pyang context, cleared before each test"""
+    base_ctx.errors = []
+    base_ctx.modules.clear()
+    return base_ctx
@@ -4,9 +4,13 @@
 """
 tests for YANG builder
 """
+from copy import copy
+
 import pytest
 
-from pyang_builder import StatementWrapper
+from pyang import statements
+
+from pyang_builder import Builder, StatementWrapper, builder
 
 __author__ = "Anderson Bravalheri"
 __copyright__ = "Copyright (C) 2016 Anderson Bravalheri"
@@ -17,6 +21,8 @@ def test_call(Y):
     """
     calling build should build statements
     calling build directly with children should build nested statements
+    explicit prefix as named parameter should work
+    explicit prefix as third positional parameter should work
     """
     prefix = Y('prefix', 'test')
     assert prefix.dump().strip() == 'prefix test;'
@@ -24,6 +30,9 @@ def test_call(Y):
     extension = Y('ext:c-define', 'INTERFACES')
     assert extension.dump().strip() == 'ext:c-define "INTERFACES";'
 
+    extension = Y('c-define', 'INTERFACES', prefix='ext')
+    assert extension.dump().strip() == 'ext:c-define "INTERFACES";'
+
     module = Y('module', 'test', [
         Y('namespace', 'urn:yang:test'),
         Y('prefix', 'test'),
@@ -55,6 +64,9 @@ def test_getattr(Y):
     extension = Y.c_define('INTERFACES', prefix='ext')
     assert extension.dump().strip() == 'ext:c-define "INTERFACES";'
 
+    extension = Y.c_define('INTERFACES', None, 'ext')
+    assert extension.dump().strip() == 'ext:c-define "INTERFACES";'
+
 
 def test_comment(Y):
     """
@@ -114,6 +126,20 @@ def test_from_tuple(Y):
         Y.from_tuple('foobar')
 
 
+def test_from_tuple_scalar_args(Y):
+    """
+    repeated tuple-expressions should not share nodes
+    scalars with the same value but different types should not be mixed
+    """
+    first = Y.from_tuple(('default', 1))
+    assert first.unwrap() is not Y.from_tuple(('default', 1)).unwrap()
+
+    assert first.arg == '1'
+    assert Y.from_tuple(('default', True)).arg == 'true'
+    assert Y.from_tuple(('default', 1.0)).arg == '1.0'
+    assert Y.from_tuple(('default', 1)).arg == '1'
+
+
 def test_mix_from_tuple_and_regular(Y):
     """
     should build entire (nested) (sub)trees
@@ -180,3 +206,100 @@ def test_statement_without_arg(Y):
     )
 
     assert module.validate()
+
+
+def test_parent(Y):
+    """
+    statements built with parent should be appended to it
+    nested statements should be appended just once
+    appending statements built with parent should not duplicate them
+    """
+    module = Y.module('test')
+    Y.namespace('urn:yang:test', parent=module)
+    Y('prefix', 'test', parent=module)
+    Y.from_tuple(('leaf', 'data', [('type', 'string')]), parent=module)
+
+    assert module.dump().strip() == (
+        'module test {\n'
+        '  namespace "urn:yang:test";\n'
+        '  prefix test;\n'
+        '  leaf data {\n'
+        '    type string;\n'
+        '  }\n'
+        '}'
+    )
+
+    leaf = Y.leaf('other', parent=module)
+    module.append(leaf)
+    module.append(Y.leaf('another', parent=module))
+    assert len(module.find('leaf')) == 3
+    assert len(module.find('leaf', 'other')) == 1
+
+
+def test_repeated_from_tuple(Y):
+    """
+    repeated tuple-expressions should produce equivalent trees
+    repeated tuple-expressions should not share nodes
+    """
+    expression = ('container', 'outer', [
+        ('leaf', 'id', [('type', 'int32'), ('default', 1)]),
+    ])
+    first = Y.from_tuple(expression)
+    second = Y.from_tuple(expression)
+
+    assert first.dump() == second.dump()
+    assert first.unwrap() is not second.unwrap()
+    assert first.find('leaf')[0].unwrap() is not (
+        second.find('leaf')[0].unwrap())
+    assert first.find('leaf').find('type')[0].unwrap() is not (
+        second.find('leaf').find('type')[0].unwrap())
+
+    second.find('leaf')[0].description('changed')
+    assert not first.find('leaf')[0].find('description')
+
+
+def test_attribute_caches_are_bounded(Y):
+    """
+    memoized attribute lookups should not grow indefinitely
+    attributes should keep working when the caches are full
+    """
+    # pylint: disable=protected-access
+    for i in range(2000):
+        getattr(Y, 'probe%d' % i)
+
+    assert len(builder._KEYWORD_CACHE) <= builder._KEYWORD_CACHE_SIZE
+    assert len(Y._factory_cache) <= builder._FACTORY_CACHE_SIZE
+    assert Y.probe1999('value').keyword == 'probe1999'
+
+
+def test_statement_classes(Y):
+    """
+    statements should be instances of the classes pyang uses for keywords
+    statements should not share positions
+    """
+    container = Y.container('outer', [('leaf', 'id', [('type', 'int32')])])
+    leaf = container.find('leaf')[0].unwrap()
+    expected = getattr(statements, 'STMT_CLASS_FOR_KEYWD', {})
+    assert isinstance(leaf, expected.get('leaf', statements.Statement))
+    assert isinstance(
+        Y.module('test').unwrap(),
+        expected.get('module', statements.Statement))
+
+    assert leaf.pos is not container.unwrap().pos
+    leaf.pos.line = 42
+    assert container.unwrap().pos.line != 42
+
+
+def test_private_attributes():
+    """
+    private attributes should not be treated as keywords
+    builders should be copiable
+    """
+    with pytest.raises(AttributeError):
+        getattr(Builder('test'), '_unknown')
+
+    uninitialized = Builder.__new__(Builder)
+    assert not hasattr(uninitialized, '_factory_cache')
+
+    other = copy(Builder('test'))
+    assert other.leaf('name').keyword == 'leaf'
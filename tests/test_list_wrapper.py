@@ -6,8 +6,6 @@ tests for List Wrapper
 """
 from itertools import chain
 
-import pytest
-
 from pyang_builder.wrappers import ListWrapper, StatementWrapper
 
 __author__ = "Anderson Bravalheri"
@@ -25,13 +23,21 @@ def test_coerce_iterators():
 def test_methods_should_be_wrapped():
     """
     methods that return lists should wrap response
+    in-place operators should not create new lists
     """
     x = ListWrapper([0, 1, 2, 3])
     assert isinstance(x + [1], ListWrapper)
+    assert x + [1] == [0, 1, 2, 3, 1]
+    assert isinstance(x * 2, ListWrapper)
+    assert isinstance(2 * x, ListWrapper)
+    assert 2 * x == [0, 1, 2, 3, 0, 1, 2, 3]
+    y = x
     x += [1]
     assert isinstance(x, ListWrapper)
+    assert x is y
     x *= 2
     assert isinstance(x, ListWrapper)
+    assert x is y
     assert isinstance(x[1:], ListWrapper)
     x.reverse()
     assert isinstance(x, ListWrapper)
@@ -41,15 +47,6 @@ def test_methods_should_be_wrapped():
     assert isinstance(x, ListWrapper)
 
 
-@pytest.fixture
-def container(Y):
-    """Sample container"""
-    return Y.container('outer', [
-        ('leaf', 'id', [('type', 'int32')]),
-        ('leaf', 'name', [('type', 'string')]),
-    ])
-
-
 def test_find_supports_chain(container):
     """
     find should return wrapper
@@ -65,6 +62,35 @@ def test_find_supports_chain(container):
     assert list(types.pick('arg')) == ['int32', 'string']
 
 
+def test_find_plain_statements(container):
+    """
+    find should accept plain statements, not wrapping their results
+    """
+    nodes = ListWrapper([container.unwrap(), container])
+    leafs = nodes.find('leaf')
+    assert len(leafs) == 4
+    assert not isinstance(leafs[0], StatementWrapper)
+    assert isinstance(leafs[2], StatementWrapper)
+    assert leafs[0] is leafs[2].unwrap()
+    assert len(nodes.find_path('leaf', 'type')) == 4
+    assert len(nodes.walk(lambda node: node.keyword == 'type')) == 4
+
+
+def test_find_path(container):
+    """
+    find_path should be equivalent to chained finds
+    find_path results should be StatementWrappers
+    """
+    nodes = ListWrapper([container, container])
+    types = nodes.find_path('leaf', 'type')
+    assert isinstance(types, ListWrapper)
+    chained = nodes.find('leaf').find('type')
+    assert types.invoke('unwrap') == chained.invoke('unwrap')
+    assert all(isinstance(node, StatementWrapper) for node in types)
+    assert list(types.pick('arg')) == ['int32', 'string'] * 2
+    assert not nodes.find_path('leaf', 'description')
+
+
 def test_walk_recursive(container):
     """
     find should search recursively, deep
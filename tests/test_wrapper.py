@@ -4,27 +4,20 @@
 """
 tests for Statement Wrapper
 """
+import sys
+
 import pytest
 
 from pyang.statements import Statement
-from pyangext.utils import create_context
 
-from pyang_builder import StatementWrapper
+from pyang_builder import ListWrapper, StatementWrapper
+from pyang_builder.wrappers import clone_statement
 
 __author__ = "Anderson Bravalheri"
 __copyright__ = "Copyright (C) 2016 Anderson Bravalheri"
 __license__ = "mozilla"
 
 
-@pytest.fixture
-def container(Y):
-    """Sample container"""
-    return Y.container('outer', [
-        ('leaf', 'id', [('type', 'int32')]),
-        ('leaf', 'name', [('type', 'string')]),
-    ])
-
-
 def test_dump(Y):
     """
     dump should correctly print wrapper
@@ -105,6 +98,35 @@ def test_mix_builder(Y):
     assert module.validate()
 
 
+def test_dump_is_updated(Y, container):
+    """
+    repeated dumps should be equal
+    dump should reflect changes made through builder and wrappers
+    dump should reflect changes made directly to the statements
+    """
+    assert container.dump() == container.dump()
+
+    leaf = container.find('leaf', 'id')[0]
+    leaf.description('identifier')
+    assert 'identifier' in container.dump()
+
+    Y.leaf('extra', parent=container)
+    assert 'extra' in container.dump()
+
+    container.append(Y.leaf('other'))
+    assert 'other' in container.dump()
+
+    # direct changes to the statements
+    container.unwrap().arg = 'renamed'
+    assert 'renamed' in container.dump()
+
+    leaf.unwrap().substmts[0].arg = 'uint8'  # type of the leaf
+    assert 'uint8' in container.dump()
+
+    container.unwrap().substmts = []
+    assert 'other' not in container.dump()
+
+
 def test_unwrap(Y):
     """
     unwrap should return pyang.statements.Statement
@@ -113,19 +135,19 @@ def test_unwrap(Y):
     assert isinstance(module.unwrap(), Statement)
 
 
-def test_validate(Y):
+def test_validate(Y, ctx):
     """
     validate should not allow non top-level statements
     module with namespace, prefix and revision should be valid
     validated modules should have i_children with all ``uses`` expanded
     validated modules should not have typedefs or extensions in i_children
+    find_child should retrieve nodes from i_children
     """
     leaf = Y.leaf('name', Y.type('string'))
 
     with pytest.raises(ValueError):
         leaf.validate()
 
-    ctx = create_context()
     ref = Y.module('test1', [
         ('namespace', 'urn:yang:test'),
         ('prefix', 'test'),
@@ -165,12 +187,16 @@ def test_validate(Y):
     assert len(raw_module.i_children) == 2
     assert raw_module.i_children[0].arg == 'leaf1'
     assert raw_module.i_children[1].arg == 'grouping2-leaf-list'
-    assert not [
-        child for child in raw_module.i_children
-        if child.keyword == 'typedef']
-    assert not [
-        child for child in raw_module.i_children
-        if child.keyword == 'extension']
+    assert not any(
+        child.keyword == 'typedef' for child in raw_module.i_children)
+    assert not any(
+        child.keyword == 'extension' for child in raw_module.i_children)
+
+    leaf = module.find_child('leaf', 'leaf1')
+    assert isinstance(leaf, StatementWrapper)
+    assert leaf.unwrap() is raw_module.i_children[0]
+    assert module.find_child('leaf-list', 'grouping2-leaf-list')
+    assert module.find_child('typedef', 'type1') is None
 
 
 def test_validate_with_warnings(Y):
@@ -202,6 +228,51 @@ def test_validate_with_warnings(Y):
         assert module.validate()
 
 
+def test_validate_syntax_only(Y):
+    """
+    syntax-only validation should accept well-formed modules
+    syntax-only validation should detect missing mandatory statements
+    """
+    module = Y.module('test', [
+        Y.namespace('urn:yang:test'),
+        Y.prefix('test'),
+        Y.leaf('name', Y.type('string')),
+    ])
+    assert module.validate(syntax_only=True)
+
+    other = Y.module('other', Y.prefix('other'))  # namespace is missing
+    assert not other.validate(rescue=True, syntax_only=True)
+
+
+def test_validate_syntax_only_yang11(Y):
+    """
+    syntax-only validation should accept YANG 1.1 statements
+    syntax-only validation should accept ``prefix:name`` extensions
+    """
+    module = Y.module('test', [
+        Y.yang_version('1.1'),
+        Y.namespace('urn:yang:test'),
+        Y.prefix('test'),
+        Y.extension('myext', Y.argument('name')),
+        Y.grouping('group', Y.leaf('id', Y.type('string'))),
+        Y.container('data', [
+            Y.uses('group'),
+            Y.action('reset'),
+            Y('test:myext', 'value'),
+        ]),
+    ])
+    assert module.validate(syntax_only=True)
+    ext = module.find('container', 'data')[0].find('test:myext')[0]
+    assert ext.keyword == 'test:myext'
+
+    old = Y.module('old', [
+        Y.namespace('urn:yang:old'),
+        Y.prefix('old'),
+        Y.container('data', Y.action('reset')),
+    ])
+    assert not old.validate(rescue=True, syntax_only=True)
+
+
 def test_find(container):
     """
     should find direct sub-statements by keyword + arg
@@ -228,6 +299,34 @@ def test_find(container):
     assert container.find(arg='value', ignore_prefix=True)
 
 
+def test_find_after_changes(Y, container):
+    """
+    repeated searches should give the same results
+    searches should reflect changes made through builder and wrappers
+    searches should reflect changes made directly to the statements
+    """
+    assert (container.find('leaf').invoke('unwrap') ==
+            container.find('leaf').invoke('unwrap'))
+
+    container.leaf('extra')
+    assert len(container.find('leaf')) == 3
+
+    container.append(Y('ext:leaf', 'other'))
+    assert len(container.find('leaf')) == 3
+    assert len(container.find('leaf', ignore_prefix=True)) == 4
+
+    # sub-statements replaced directly (same length)
+    node = container.unwrap()
+    node.substmts = node.substmts[:3] + [Y.leaf('last').unwrap()]
+    assert [leaf.arg for leaf in container.find('leaf')] == [
+        'id', 'name', 'extra', 'last']
+
+    # keywords changed directly
+    container.find('leaf', 'last')[0].unwrap().keyword = 'leaf-list'
+    assert len(container.find('leaf')) == 3
+    assert [node.arg for node in container.find('leaf-list')] == ['last']
+
+
 def test_append(Y, container):
     """
     Append should accept N (mixed) arguments
@@ -257,3 +356,102 @@ def test_append(Y, container):
 
     result = container.find('other:ext')[-1].unwrap()
     assert id(result) != id(other_ext)
+
+
+def test_clone_statement(container):
+    """
+    clones should be equivalent to the original statement
+    clones should not share nodes with the original statement
+    clones should be attached to the given parent
+    """
+    original = container.unwrap()
+    clone = clone_statement(original)
+    assert clone is not original
+    assert clone.parent is None
+    assert [child.arg for child in clone.substmts] == ['id', 'name']
+    assert all(child.parent is clone for child in clone.substmts)
+    assert not set(clone.substmts) & set(original.substmts)
+
+    child = clone_statement(original.substmts[0], parent=clone)
+    assert child.parent is clone
+    assert child.substmts[0].arg == 'int32'
+
+
+def test_clone_parsed_statement(ctx):
+    """
+    clones should preserve the class of the statements
+    clones should preserve extensions and module references
+    """
+    module = ctx.add_module('test', """
+        module test {
+            namespace "urn:yang:test";
+            prefix test;
+            extension myext { argument name; }
+            container data {
+                test:myext "value";
+                leaf id { type string; }
+            }
+        }
+    """)
+    ctx.validate()
+
+    clone = clone_statement(module)
+    assert type(clone) is type(module)  # pylint: disable=unidiomatic-typecheck
+    assert clone.i_version == module.i_version
+
+    data = clone.search_one('container')
+    assert data.i_module is module
+    assert data.parent is clone
+    assert [child.arg for child in data.i_children] == ['id']
+
+    ext = data.substmts[0]
+    original = module.search_one('container').substmts[0]
+    assert ext is not original
+    assert ext.keyword == original.keyword == ('test', 'myext')
+    assert ext.ext_mod == original.ext_mod
+    assert ext.pos is not original.pos
+
+
+def test_copy(Y, container):
+    """
+    copy should keep the parent of the original node by default
+    copy should accept wrappers as parent
+    copy should accept the arguments of ``Statement.copy``
+    """
+    leaf = container.find('leaf', 'id')[0]
+    clone = leaf.copy()
+    assert clone is not leaf
+    assert clone.unwrap().parent is container.unwrap()
+
+    other = Y.container('other')
+    assert leaf.copy(other).unwrap().parent is other.unwrap()
+
+    clone = container.copy(nocopy=('leaf',))
+    assert clone.unwrap().substmts == container.unwrap().substmts
+    clone = container.copy(parent=other, ignore=('leaf',))
+    assert clone.unwrap().parent is other.unwrap()
+    assert not clone.unwrap().substmts
+
+
+def test_walk(Y, container):
+    """
+    walk should visit nodes in pre-order, starting from the node itself
+    walk should not be limited by the recursion limit
+    """
+    args = container.walk(apply=lambda node: node.arg)
+    assert list(args) == ['outer', 'id', 'int32', 'name', 'string']
+
+    depth = sys.getrecursionlimit() + 10
+    node = root = Y.container('level0')
+    for i in range(1, depth):
+        node = node.container('level%d' % i)
+
+    assert len(root.walk(lambda node: node.keyword == 'container')) == depth
+
+
+def test_slots():
+    """
+    wrappers should not carry a per-instance ``__dict__``
+    """
+    assert '__dict__' not in dir(StatementWrapper)
+    assert '__dict__' not in dir(ListWrapper)